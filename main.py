@@ -96,6 +96,35 @@ Examples:
         help='Output format for combined file (default: mp3)'
     )
     
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=4,
+        help='Number of chunk batches synthesized in parallel (default: 4)'
+    )
+    
+    parser.add_argument(
+        '-b', '--batch-size',
+        type=int,
+        default=8,
+        help='Number of text chunks per TTS forward pass (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--dtype',
+        type=str,
+        choices=['fp32', 'fp16', 'int8'],
+        default='fp32',
+        help='TTS inference precision: fp16 needs CUDA, int8 runs on CPU (default: fp32)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help='Directory for caching synthesized speech between runs (default: disabled)'
+    )
+    
     parser.add_argument(
         '--list-voices',
         action='store_true',
@@ -146,7 +175,11 @@ Examples:
         generator = AudiobookGenerator(
             epub_path=str(input_path),
             output_dir=str(output_dir),
-            voice=args.voice
+            voice=args.voice,
+            max_workers=args.workers,
+            cache_dir=args.cache_dir,
+            batch_size=args.batch_size,
+            dtype=args.dtype
         )
         
         chapter_files = generator.generate_audiobook()
@@ -1,6 +1,11 @@
 """Main audiobook generation coordinator."""
 
+import functools
 import logging
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional
 from tqdm import tqdm
@@ -9,15 +14,30 @@ import time
 from .epub_parser import EPUBParser
 from .text_processor import TextProcessor
 from .tts_engine import KokoroTTSEngine
+from .wav_io import concatenate_wav
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Characters that are invalid in filenames are dropped, spaces become underscores
+_FILENAME_TRANSLATION = str.maketrans({c: None for c in '<>:"/\\|?*'} | {' ': '_'})
+
 
 class AudiobookGenerator:
     """Generate audiobooks from EPUB files using Kokoro TTS."""
     
-    def __init__(self, epub_path: str, output_dir: str, voice: str = 'af_heart'):
+    # Samples per read when streaming audio between files
+    BLOCK_SIZE = 65536
+    
+    # ffmpeg encoder arguments for compressed combined output
+    EXPORT_CODECS = {
+        'wav': [],
+        'mp3': ['-c:a', 'libmp3lame', '-b:a', '64k'],
+        'ogg': ['-c:a', 'libvorbis'],
+    }
+    
+    def __init__(self, epub_path: str, output_dir: str, voice: str = 'af_heart',
+                 max_workers: int = 4, cache_dir: Optional[str] = None,
+                 batch_size: int = 8, dtype: str = 'fp32'):
         """
         Initialize the audiobook generator.
         
@@ -25,10 +45,20 @@ class AudiobookGenerator:
             epub_path: Path to EPUB file
             output_dir: Directory for output audio files
             voice: Kokoro voice to use
+            max_workers: Number of chunk batches synthesized concurrently
+                (around 4 on CPU, 1-2 on GPU)
+            cache_dir: Directory for reusing synthesized speech across runs
+                (None disables the cache)
+            batch_size: Number of chunks per TTS model forward pass
+            dtype: TTS inference precision ('fp32', 'fp16' or 'int8')
         """
         self.epub_path = Path(epub_path)
         self.output_dir = Path(output_dir)
         self.voice = voice
+        self.max_workers = max(1, max_workers)
+        self.cache_dir = cache_dir
+        self.batch_size = max(1, batch_size)
+        self.dtype = dtype
         
         # Validate input
         if not self.epub_path.exists():
@@ -42,6 +72,12 @@ class AudiobookGenerator:
         self.text_processor = TextProcessor()
         self.tts_engine = None
         
+        # Background writer so WAV output overlaps with synthesis of the next chunks,
+        # started on first use and stopped once all chapters are generated
+        self._write_queue = queue.Queue(maxsize=4)
+        self._writer = None
+        self._failed_writes = set()
+        
     def generate_audiobook(self) -> List[str]:
         """
         Generate audiobook from EPUB file.
@@ -61,7 +97,10 @@ class AudiobookGenerator:
         
         # Initialize TTS engine
         logger.info("Initializing TTS engine...")
-        self.tts_engine = KokoroTTSEngine(voice=self.voice)
+        self.tts_engine = KokoroTTSEngine(
+            voice=self.voice, cache_dir=self.cache_dir, dtype=self.dtype,
+            write_queue=self._write_queue
+        )
         
         # Generate audio for each chapter
         output_files = []
@@ -93,21 +132,16 @@ class AudiobookGenerator:
                 logger.info(f"Split into {len(chunks)} chunks")
                 
                 # Generate audio for each chunk
-                chapter_audio_files = []
-                for j, chunk in enumerate(chunks):
-                    chunk_file = self.output_dir / f"chapter_{chapter_num:03d}_chunk_{j:03d}.wav"
-                    
-                    success = self.tts_engine.generate_speech(chunk, str(chunk_file))
-                    
-                    if success:
-                        chapter_audio_files.append(str(chunk_file))
-                    else:
-                        logger.warning(f"Failed to generate audio for chunk {j}")
+                chapter_audio_files = self._generate_chunks(chapter_num, chunks)
                 
                 # Combine chunks into single chapter file
                 if chapter_audio_files:
                     chapter_file = self.output_dir / f"chapter_{chapter_num:03d}_{self._sanitize_filename(chapter_title)}.wav"
-                    self._combine_audio_files(chapter_audio_files, str(chapter_file))
+                    if not self._combine_audio_files(chapter_audio_files, str(chapter_file)):
+                        # Keep the chunk files so the generated audio is not lost
+                        logger.error(f"Failed to combine chunks of chapter {chapter_num}")
+                        chapter_file.unlink(missing_ok=True)
+                        continue
                     output_files.append(str(chapter_file))
                     
                     # Clean up chunk files
@@ -123,6 +157,8 @@ class AudiobookGenerator:
                 logger.error(f"Error processing chapter {i+1}: {e}")
                 continue
         
+        self._stop_writer()
+        
         # Summary
         total_duration_str = self.text_processor.format_duration(total_duration)
         logger.info(f"\n{'='*60}")
@@ -134,6 +170,81 @@ class AudiobookGenerator:
         
         return output_files
     
+    def _generate_chunks(self, chapter_num: int, chunks: List[str]) -> List[str]:
+        """
+        Synthesize all chunks of a chapter, keeping the TTS engine busy.
+        
+        Args:
+            chapter_num: Chapter number used in chunk file names
+            chunks: Text chunks of the chapter
+            
+        Returns:
+            Paths of successfully generated chunk files, in chunk order
+        """
+        chunk_files = [
+            str(self.output_dir / f"chapter_{chapter_num:03d}_chunk_{j:03d}.wav")
+            for j in range(len(chunks))
+        ]
+        
+        self._start_writer()
+        
+        # Each task is one mini-batch, synthesized in a single model forward pass
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                j: executor.submit(
+                    self.tts_engine.generate_speech_batch,
+                    chunks[j:j + self.batch_size],
+                    chunk_files[j:j + self.batch_size],
+                    self.batch_size
+                )
+                for j in range(0, len(chunks), self.batch_size)
+            }
+        
+        # Wait until every chunk of the chapter is on disk
+        self._write_queue.join()
+        
+        chapter_audio_files = []
+        for start, future in futures.items():
+            for j, success in enumerate(future.result(), start):
+                # Synthesis succeeds before the background write has happened
+                if success and chunk_files[j] not in self._failed_writes:
+                    chapter_audio_files.append(chunk_files[j])
+                else:
+                    logger.warning("Failed to generate audio for chunk %d", j)
+        self._failed_writes.clear()
+        
+        return chapter_audio_files
+    
+    def _start_writer(self):
+        """Start the background writer thread if it is not running."""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_worker, daemon=True)
+            self._writer.start()
+    
+    def _stop_writer(self):
+        """Let the background writer finish queued files and stop it."""
+        if self._writer is not None:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
+    
+    def _write_worker(self):
+        """Write queued audio files until a None sentinel is received."""
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is None:
+                    return
+                output_path, write, args = item
+                try:
+                    write(*args)
+                except Exception as e:
+                    logger.error("Error writing audio file %s: %s", output_path, e)
+                    self._failed_writes.add(output_path)
+                    Path(output_path).unlink(missing_ok=True)
+            finally:
+                self._write_queue.task_done()
+    
     def combine_chapters(self, chapter_files: List[str], output_file: str) -> bool:
         """
         Combine all chapter audio files into a single file.
@@ -145,51 +256,92 @@ class AudiobookGenerator:
         Returns:
             True if successful, False otherwise
         """
+        output_path = Path(output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Determine format from extension
+        file_format = output_path.suffix[1:].lower()
+        if file_format not in self.EXPORT_CODECS:
+            file_format = 'mp3'
+        
         try:
-            from pydub import AudioSegment
-            from pydub.silence import Silence
+            import soundfile as sf
             
             logger.info("Combining chapters into single file...")
             
-            combined = AudioSegment.empty()
-            silence = AudioSegment.silent(duration=2000)  # 2 seconds silence
+            samplerate = sf.info(chapter_files[0]).samplerate
+            blocks = self._iter_chapter_blocks(chapter_files, samplerate)
             
-            for i, chapter_file in enumerate(tqdm(chapter_files, desc="Combining")):
+            if file_format == 'wav':
+                # Splice chapters that share one format without decoding them
+                if not concatenate_wav(chapter_files, str(output_path),
+                                       silence_frames=2 * samplerate):
+                    # Otherwise stream each chapter into one writer
+                    with sf.SoundFile(str(output_path), 'w', samplerate=samplerate, channels=1,
+                                      subtype='FLOAT', format='WAV') as out:
+                        for block in blocks:
+                            out.write(block)
+            else:
+                # Pipe raw float32 PCM to ffmpeg so the encoder is the only conversion step
+                logger.info(f"Exporting as {file_format.upper()}...")
+                proc = subprocess.Popen(
+                    ['ffmpeg', '-y', '-loglevel', 'error',
+                     '-f', 'f32le', '-ar', str(samplerate), '-ac', '1', '-i', 'pipe:0',
+                     *self.EXPORT_CODECS[file_format], str(output_path)],
+                    stdin=subprocess.PIPE
+                )
                 try:
-                    audio = AudioSegment.from_wav(chapter_file)
-                    combined += audio
-                    
-                    # Add silence between chapters (except after last chapter)
-                    if i < len(chapter_files) - 1:
-                        combined += silence
-                        
-                except Exception as e:
-                    logger.warning(f"Error loading {chapter_file}: {e}")
-                    continue
-            
-            # Export
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Determine format from extension
-            file_format = output_path.suffix[1:].lower()
-            if file_format not in ['wav', 'mp3', 'ogg']:
-                file_format = 'mp3'
-            
-            logger.info(f"Exporting as {file_format.upper()}...")
-            combined.export(str(output_path), format=file_format)
+                    for block in blocks:
+                        proc.stdin.write(block.tobytes())
+                finally:
+                    proc.stdin.close()
+                    returncode = proc.wait()
+                
+                if returncode != 0:
+                    raise RuntimeError(f"ffmpeg exited with status {returncode}")
             
             logger.info(f"✓ Combined audiobook saved to: {output_path}")
             return True
             
-        except ImportError:
-            logger.error("pydub not installed. Install with: pip install pydub")
-            logger.error("Also install ffmpeg for MP3 support")
+        except FileNotFoundError as e:
+            if e.filename == 'ffmpeg':
+                logger.error("ffmpeg not found. Install ffmpeg for MP3 support")
+            else:
+                logger.error(f"Error combining chapters: {e}")
             return False
         except Exception as e:
             logger.error(f"Error combining chapters: {e}")
             return False
     
+    def _iter_chapter_blocks(self, chapter_files: List[str], samplerate: int):
+        """
+        Yield the audio of all chapters as float32 blocks, with silence between chapters.
+        
+        Args:
+            chapter_files: List of chapter audio file paths
+            samplerate: Sample rate of the chapter files
+            
+        Yields:
+            Mono float32 sample blocks
+        """
+        import soundfile as sf
+        import numpy as np
+        
+        silence = np.zeros(2 * samplerate, dtype=np.float32)  # 2 seconds silence
+        
+        for i, chapter_file in enumerate(tqdm(chapter_files, desc="Combining")):
+            try:
+                for block in sf.blocks(chapter_file, blocksize=self.BLOCK_SIZE,
+                                       dtype='float32'):
+                    yield block
+            except Exception as e:
+                logger.warning(f"Error loading {chapter_file}: {e}")
+                continue
+            
+            # Add silence between chapters (except after last chapter)
+            if i < len(chapter_files) - 1:
+                yield silence
+    
     def _combine_audio_files(self, audio_files: List[str], output_file: str) -> bool:
         """
         Combine multiple audio files into one.
@@ -202,20 +354,23 @@ class AudiobookGenerator:
             True if successful
         """
         try:
-            import soundfile as sf
-            import numpy as np
+            # Splice raw sample data when all chunks share one format
+            if concatenate_wav(audio_files, output_file):
+                return True
             
-            combined_audio = []
-            
-            for audio_file in audio_files:
-                data, samplerate = sf.read(audio_file)
-                combined_audio.append(data)
+            import soundfile as sf
             
-            # Concatenate
-            full_audio = np.concatenate(combined_audio)
+            # All chunks come from the same engine, so the first one defines the format
+            info = sf.info(audio_files[0])
             
-            # Save
-            sf.write(output_file, full_audio, samplerate)
+            # Stream block by block so memory stays bounded regardless of chapter length
+            with sf.SoundFile(output_file, 'w', samplerate=info.samplerate,
+                              channels=info.channels, subtype=info.subtype,
+                              format='WAV') as out:
+                for audio_file in audio_files:
+                    for block in sf.blocks(audio_file, blocksize=self.BLOCK_SIZE,
+                                           dtype='float32', always_2d=info.channels > 1):
+                        out.write(block)
             return True
             
         except Exception as e:
@@ -223,6 +378,7 @@ class AudiobookGenerator:
             return False
     
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _sanitize_filename(filename: str) -> str:
         """
         Sanitize filename to remove invalid characters.
@@ -233,16 +389,12 @@ class AudiobookGenerator:
         Returns:
             Sanitized filename
         """
-        # Remove invalid characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '')
-        
-        # Limit length
-        if len(filename) > 100:
-            filename = filename[:100]
+        # Remove invalid characters and replace spaces with underscores in one pass
+        filename = filename.translate(_FILENAME_TRANSLATION)
         
-        # Replace spaces with underscores
-        filename = filename.replace(' ', '_')
+        # Limit length in bytes, as filesystems do, without splitting a character
+        encoded = filename.encode('utf-8')
+        if len(encoded) > 100:
+            filename = encoded[:100].decode('utf-8', 'ignore')
         
         return filename
\ No newline at end of file
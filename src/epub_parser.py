@@ -1,14 +1,48 @@
 """EPUB file parser for extracting text content."""
 
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+import codecs
+import os
+import posixpath
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from lxml import etree, html
+from typing import List, Dict, Optional, Tuple
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Location of the container file pointing at the package document
+CONTAINER_PATH = 'META-INF/container.xml'
+
+NAMESPACES = {
+    'container': 'urn:oasis:names:tc:opendocument:xmlns:container',
+    'opf': 'http://www.idpf.org/2007/opf',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+}
+
+# Manifest media types that hold chapter content
+DOCUMENT_MEDIA_TYPES = ('application/xhtml+xml', 'text/html')
+
+_RE_WHITESPACE = re.compile(r'\s+')
+
+# Elements whose text must stay separate from the text that follows them
+BLOCK_TAGS = (
+    'title', 'p', 'div', 'br', 'li', 'dt', 'dd', 'blockquote', 'pre', 'td', 'th',
+    'section', 'article', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+)
+
+# Encoding declared by an XML declaration or a meta charset near the start of a document
+_RE_DECLARED_ENCODING = re.compile(
+    rb'<\?xml[^>]*?encoding=["\']([\w.:-]+)|<meta[^>]*?charset=["\']?([\w.:-]+)',
+    re.IGNORECASE
+)
+
+# Elements that may hold a chapter title, in order of preference
+TITLE_TAGS = ('h1', 'h2', 'h3', 'title')
+_TITLE_XPATH = etree.XPath(' | '.join(f'//{tag}[normalize-space()]' for tag in TITLE_TAGS))
+
 
 class EPUBParser:
     """Parser for EPUB files to extract chapters and metadata."""
@@ -21,12 +55,16 @@ class EPUBParser:
             epub_path: Path to the EPUB file
         """
         self.epub_path = epub_path
-        self.book = None
+        self.package = None
+        self.package_dir = ''
         
     def parse_epub(self) -> List[Dict[str, str]]:
         """
         Parse the EPUB file and extract all chapters.
         
+        Chapters are read straight from the ZIP archive and parsed concurrently,
+        up to one per CPU at a time; results are returned in spine order.
+        
         Returns:
             List of dictionaries containing chapter title and text
             
@@ -35,45 +73,38 @@ class EPUBParser:
             Exception: If EPUB file is invalid or corrupted
         """
         try:
-            self.book = epub.read_epub(self.epub_path)
+            archive = zipfile.ZipFile(self.epub_path)
         except FileNotFoundError:
             logger.error(f"EPUB file not found: {self.epub_path}")
             raise
         except Exception as e:
             logger.error(f"Error reading EPUB file: {e}")
             raise Exception(f"Invalid or corrupted EPUB file: {e}")
-        
+            
         chapters = []
         
-        # Get all document items (chapters)
-        items = list(self.book.get_items_of_type(ebooklib.ITEM_DOCUMENT))
-        
-        for i, item in enumerate(items):
+        with archive:
             try:
-                # Extract HTML content
-                content = item.get_content()
-                
-                # Parse HTML and extract text
-                soup = BeautifulSoup(content, 'lxml')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                # Get text
-                text = soup.get_text()
+                self._load_package(archive)
+                # Get all document items (chapters) in reading order
+                hrefs = self._get_spine_hrefs()
+            except Exception as e:
+                logger.error(f"Error reading EPUB file: {e}")
+                raise Exception(f"Invalid or corrupted EPUB file: {e}")
                 
-                # Clean up whitespace
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                text = ' '.join(chunk for chunk in chunks if chunk)
+            # Chapters are independent and lxml releases the GIL while parsing
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                results = list(executor.map(
+                    lambda item: self._parse_chapter(archive, *item), enumerate(hrefs)
+                ))
                 
-                # Skip if empty
-                if not text or len(text.strip()) < 50:
+            # Results come back in spine order
+            for result in results:
+                if result is None:
                     continue
-                
-                # Try to get chapter title
-                title = self._extract_title(soup) or f"Chapter {len(chapters) + 1}"
+                    
+                title, text = result
+                title = title or f"Chapter {len(chapters) + 1}"
                 
                 chapters.append({
                     'title': title,
@@ -82,33 +113,134 @@ class EPUBParser:
                 
                 logger.info(f"Extracted: {title} ({len(text)} characters)")
                 
-            except Exception as e:
-                logger.warning(f"Error processing item {i}: {e}")
-                continue
-        
         if not chapters:
             raise Exception("No readable content found in EPUB file")
-        
+            
         logger.info(f"Successfully extracted {len(chapters)} chapters")
         return chapters
-    
-    def _extract_title(self, soup: BeautifulSoup) -> Optional[str]:
+        
+    def _parse_chapter(self, archive: zipfile.ZipFile, index: int,
+                       href: str) -> Optional[Tuple[Optional[str], str]]:
+        """
+        Extract the title and text of one content document.
+        
+        Args:
+            archive: Open EPUB archive
+            index: Position of the document in the spine
+            href: Archive member name of the document
+            
+        Returns:
+            Tuple of chapter title (or None) and text, or None if the document has no readable content
+        """
+        try:
+            content = archive.read(href)
+            parser = html.HTMLParser(encoding=self._detect_encoding(content))
+            root = html.document_fromstring(content, parser=parser)
+                
+            # Remove script and style elements
+            for element in root.xpath('//script|//style'):
+                element.drop_tree()
+                
+            # Separate block elements only, so inline markup inside a word
+            # (drop caps, mid-word italics) does not split it
+            for element in root.iter(*BLOCK_TAGS):
+                element.tail = ' ' + (element.tail or '')
+                
+            # Get text, collapsing whitespace runs in a single pass
+            text = _RE_WHITESPACE.sub(' ', root.text_content()).strip()
+            
+            # Skip if empty
+            if not text or len(text.strip()) < 50:
+                return None
+                
+            # Try to get chapter title
+            return self._extract_title(root), text
+            
+        except Exception as e:
+            logger.warning(f"Error processing item {index}: {e}")
+            return None
+            
+    @staticmethod
+    def _detect_encoding(content: bytes) -> Optional[str]:
+        """
+        Detect the character encoding of a content document.
+        
+        libxml2's HTML parser assumes Latin-1 when a document declares nothing,
+        whereas XHTML defaults to UTF-8.
+        
+        Args:
+            content: Raw document bytes
+            
+        Returns:
+            Declared encoding, None if a byte order mark identifies it, UTF-8 otherwise
+        """
+        if content.startswith((codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            # libxml2 detects byte order marks itself
+            return None
+            
+        match = _RE_DECLARED_ENCODING.search(content, 0, 1024)
+        if match:
+            encoding = (match.group(1) or match.group(2)).decode('ascii')
+            try:
+                codecs.lookup(encoding)
+                return encoding
+            except LookupError:
+                logger.warning(f"Unknown encoding {encoding}, assuming UTF-8")
+        return 'utf-8'
+        
+    def _load_package(self, archive: zipfile.ZipFile):
+        """
+        Locate and parse the OPF package document.
+        
+        Args:
+            archive: Open EPUB archive
+        """
+        container = etree.fromstring(archive.read(CONTAINER_PATH))
+        rootfiles = container.xpath('//container:rootfile/@full-path', namespaces=NAMESPACES)
+        if not rootfiles:
+            raise ValueError("No package document listed in container.xml")
+            
+        package_path = rootfiles[0]
+        self.package = etree.fromstring(archive.read(package_path))
+        self.package_dir = posixpath.dirname(package_path)
+        
+    def _get_spine_hrefs(self) -> List[str]:
         """
-        Extract chapter title from HTML soup.
+        Get archive paths of the content documents in spine order.
+        
+        Returns:
+            List of archive member names
+        """
+        manifest = {}
+        for item in self.package.xpath('//opf:manifest/opf:item', namespaces=NAMESPACES):
+            if item.get('media-type') in DOCUMENT_MEDIA_TYPES:
+                manifest[item.get('id')] = item.get('href')
+                
+        hrefs = []
+        for idref in self.package.xpath('//opf:spine/opf:itemref/@idref', namespaces=NAMESPACES):
+            href = manifest.get(idref)
+            if href:
+                href = unquote(href.split('#', 1)[0])
+                hrefs.append(posixpath.normpath(posixpath.join(self.package_dir, href)))
+        return hrefs
+        
+    def _extract_title(self, root: html.HtmlElement) -> Optional[str]:
+        """
+        Extract chapter title from an HTML document.
         
         Args:
-            soup: BeautifulSoup object
+            root: Root element of the parsed chapter
             
         Returns:
             Chapter title or None
         """
-        # Try different heading tags
-        for tag in ['h1', 'h2', 'h3', 'title']:
-            heading = soup.find(tag)
-            if heading and heading.get_text().strip():
-                return heading.get_text().strip()
-        return None
-    
+        # Collect all non-empty candidates in one traversal, then prefer by tag rank
+        headings = _TITLE_XPATH(root)
+        if not headings:
+            return None
+        heading = min(headings, key=lambda element: TITLE_TAGS.index(element.tag))
+        return heading.text_content().strip()
+        
     def get_metadata(self) -> Dict[str, str]:
         """
         Extract metadata from the EPUB file.
@@ -116,13 +248,14 @@ class EPUBParser:
         Returns:
             Dictionary containing title, author, and language
         """
-        if not self.book:
+        if self.package is None:
             try:
-                self.book = epub.read_epub(self.epub_path)
+                with zipfile.ZipFile(self.epub_path) as archive:
+                    self._load_package(archive)
             except Exception as e:
                 logger.error(f"Error reading EPUB metadata: {e}")
                 return {'title': 'Unknown', 'author': 'Unknown', 'language': 'en'}
-        
+                
         metadata = {
             'title': 'Unknown',
             'author': 'Unknown',
@@ -130,22 +263,14 @@ class EPUBParser:
         }
         
         try:
-            # Get title
-            title = self.book.get_metadata('DC', 'title')
-            if title:
-                metadata['title'] = title[0][0]
-            
-            # Get author
-            author = self.book.get_metadata('DC', 'creator')
-            if author:
-                metadata['author'] = author[0][0]
-            
-            # Get language
-            language = self.book.get_metadata('DC', 'language')
-            if language:
-                metadata['language'] = language[0][0]
-                
+            for key, element in [('title', 'title'), ('author', 'creator'), ('language', 'language')]:
+                values = self.package.xpath(
+                    f'//opf:metadata/dc:{element}/text()', namespaces=NAMESPACES
+                )
+                if values and values[0].strip():
+                    metadata[key] = values[0].strip()
+                    
         except Exception as e:
             logger.warning(f"Error extracting metadata: {e}")
-        
-        return metadata
\ No newline at end of file
+            
+        return metadata
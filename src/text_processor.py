@@ -4,9 +4,32 @@ import re
 from typing import List
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Patterns used by clean_text, compiled once at import
+_RE_SPACES = re.compile(r' +')
+_RE_NEWLINES = re.compile(r'\n\s*\n\s*\n+')
+_RE_SINGLE_NEWLINE = re.compile(r'(?<!\n)\n(?!\n)')
+_RE_URL = re.compile(r'https?://\S+')
+_RE_DOTS = re.compile(r'\.{4,}')
+_RE_REPEATED_MARKS = re.compile(r'([!?])\1+')
+
+# Break points used by chunk_text, in order of preference
+_SENTENCE_BREAKS = ('. ', '! ', '? ', '.\n', '!\n', '?\n')
+_WORD_BREAKS = (' ', '\n')
+
+# Single-character replacements applied with str.translate
+_CHAR_TRANSLATION = str.maketrans({
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2018': "'",
+    '\u2019': "'",
+    '\u2013': '-',
+    '\u2014': '-',
+    '\r': '',
+    '\t': ' ',
+})
+
 
 class TextProcessor:
     """Process and prepare text for TTS conversion."""
@@ -25,40 +48,24 @@ class TextProcessor:
         if not text:
             return ""
         
+        # Normalize special characters and whitespace in one pass
+        text = text.translate(_CHAR_TRANSLATION).replace('\u2026', '...')
+        
         # Remove multiple spaces
-        text = re.sub(r' +', ' ', text)
+        text = _RE_SPACES.sub(' ', text)
         
         # Remove multiple newlines but preserve paragraph breaks
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+        text = _RE_NEWLINES.sub('\n\n', text)
         
         # Remove single newlines (join paragraphs)
-        text = re.sub(r'(?<!\n)\n(?!\n)', ' ', text)
-        
-        # Fix common issues
-        text = text.replace('\r', '')
-        text = text.replace('\t', ' ')
+        text = _RE_SINGLE_NEWLINE.sub(' ', text)
         
         # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        
-        # Handle common special characters
-        replacements = {
-            '"': '"',
-            '"': '"',
-            ''': "'",
-            ''': "'",
-            '–': '-',
-            '—': '-',
-            '…': '...',
-        }
-        
-        for old, new in replacements.items():
-            text = text.replace(old, new)
+        text = _RE_URL.sub('', text)
         
         # Remove excessive punctuation
-        text = re.sub(r'\.{4,}', '...', text)
-        text = re.sub(r'!{2,}', '!', text)
-        text = re.sub(r'\?{2,}', '?', text)
+        text = _RE_DOTS.sub('...', text)
+        text = _RE_REPEATED_MARKS.sub(r'\1', text)
         
         # Strip leading/trailing whitespace
         text = text.strip()
@@ -80,55 +87,48 @@ class TextProcessor:
         if not text:
             return []
         
-        # First split by paragraph
-        paragraphs = text.split('\n\n')
         chunks = []
-        
-        for paragraph in paragraphs:
-            paragraph = paragraph.strip()
-            if not paragraph:
-                continue
-            
-            # If paragraph is short enough, add it as is
-            if len(paragraph) <= max_chars:
-                chunks.append(paragraph)
-                continue
-            
-            # Otherwise, split by sentences
-            sentences = re.split(r'(?<=[.!?])\s+', paragraph)
-            current_chunk = ""
+        length = len(text)
+        pos = 0
+        
+        # Single forward pass: only slice indices move, text is copied once per chunk
+        while pos < length:
+            # Paragraphs always end a chunk
+            paragraph_end = text.find('\n\n', pos)
+            if paragraph_end == -1:
+                paragraph_end = length
             
-            for sentence in sentences:
-                # If adding this sentence would exceed limit
-                if len(current_chunk) + len(sentence) + 1 > max_chars:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                        current_chunk = ""
-                    
-                    # If single sentence is too long, split it
-                    if len(sentence) > max_chars:
-                        words = sentence.split()
-                        temp_chunk = ""
-                        
-                        for word in words:
-                            if len(temp_chunk) + len(word) + 1 > max_chars:
-                                if temp_chunk:
-                                    chunks.append(temp_chunk.strip())
-                                temp_chunk = word
-                            else:
-                                temp_chunk += (" " + word) if temp_chunk else word
-                        
-                        if temp_chunk:
-                            current_chunk = temp_chunk
-                    else:
-                        current_chunk = sentence
-                else:
-                    current_chunk += (" " + sentence) if current_chunk else sentence
+            start = pos
+            while start < paragraph_end:
+                # Skip whitespace between chunks
+                while start < paragraph_end and text[start].isspace():
+                    start += 1
+                
+                if paragraph_end - start <= max_chars:
+                    chunk = text[start:paragraph_end].strip()
+                    if chunk:
+                        chunks.append(chunk)
+                    break
+                
+                window_end = start + max_chars
+                
+                # Prefer the last sentence end that fits, then the last word boundary
+                cut = max(text.rfind(mark, start, window_end + 1) for mark in _SENTENCE_BREAKS) + 1
+                if cut <= start:
+                    cut = max(text.rfind(mark, start, window_end + 1) for mark in _WORD_BREAKS)
+                if cut <= start:
+                    # Single word longer than max_chars, keep it whole
+                    cut = min(
+                        (i for i in (text.find(mark, window_end, paragraph_end) for mark in _WORD_BREAKS) if i != -1),
+                        default=paragraph_end
+                    )
+                
+                chunks.append(text[start:cut].strip())
+                start = cut
             
-            if current_chunk:
-                chunks.append(current_chunk.strip())
+            pos = paragraph_end + 2
         
-        logger.info(f"Split text into {len(chunks)} chunks")
+        logger.debug("Split text into %d chunks", len(chunks))
         return chunks
     
     @staticmethod
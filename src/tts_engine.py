@@ -1,9 +1,17 @@
 """Kokoro TTS engine wrapper."""
 
+import contextlib
+import functools
+import hashlib
 import logging
-from typing import Optional
+import os
+import queue
+import re
+import shutil
+import threading
+import uuid
+from typing import List, Optional
 from pathlib import Path
-import soundfile as sf
 import numpy as np
 
 try:
@@ -11,12 +19,49 @@ try:
 except ImportError:
     raise ImportError("Kokoro TTS not installed. Run: pip install kokoro")
 
-logging.basicConfig(level=logging.INFO)
+import torch
+
+from .wav_io import write_wav_f32_mono
+
 logger = logging.getLogger(__name__)
 
+# Phonemizers fall back to espeak-ng, whose global state is not reentrant, so
+# g2p calls are serialized across all pipelines while model forwards run concurrently
+_G2P_LOCK = threading.Lock()
+
+# KPipeline phonemizes text split on newlines
+_RE_SEGMENT_SPLIT = re.compile(r'\n+')
+
+
+@functools.lru_cache(maxsize=4)
+def _get_pipeline(lang_code: str, device: str, dtype: str) -> KPipeline:
+    """
+    Get a shared Kokoro pipeline, loading the model on first use.
+    
+    Args:
+        lang_code: Language code
+        device: Torch device for the model
+        dtype: Inference precision ('int8' quantizes the model)
+        
+    Returns:
+        KPipeline instance reused for identical arguments
+    """
+    pipeline = KPipeline(lang_code=lang_code, device=device)
+    if dtype == 'int8':
+        # Dynamic quantization swaps Linear layers for int8 kernels, which only run on CPU
+        pipeline.model = torch.ao.quantization.quantize_dynamic(
+            pipeline.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+    return pipeline
+
 
 class KokoroTTSEngine:
-    """Wrapper for Kokoro TTS engine."""
+    """
+    Wrapper for Kokoro TTS engine.
+    
+    Pipelines are shared per (language, device, precision) for the lifetime of the
+    process, so constructing further engines does not reload the model.
+    """
     
     # Available voices in Kokoro
     AVAILABLE_VOICES = [
@@ -31,27 +76,105 @@ class KokoroTTSEngine:
         'bm_lewis',  # Male, British English
     ]
     
-    def __init__(self, lang_code: str = 'a', voice: str = 'af_heart'):
+    # Default upper bound for the on-disk speech cache (2 GiB)
+    DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+    
+    # Fraction of the cache size limit that eviction frees down to, so a full
+    # cache is not rescanned on every store
+    CACHE_EVICT_TARGET = 0.9
+    
+    # Supported inference precisions
+    DTYPES = ('fp32', 'fp16', 'int8')
+    
+    def __init__(self, lang_code: str = 'a', voice: str = 'af_heart',
+                 cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 dtype: str = 'fp32',
+                 write_queue: Optional[queue.Queue] = None):
         """
         Initialize Kokoro TTS engine.
         
         Args:
             lang_code: Language code ('a' for American English, 'b' for British)
             voice: Voice name to use
+            cache_dir: Directory for cached speech files (None disables caching)
+            cache_max_bytes: Size above which least recently used cache entries are evicted
+            dtype: Inference precision: 'fp32', 'fp16' (CUDA only) or 'int8' (CPU only)
+            write_queue: Queue consumed by a writer thread; audio files are written
+                inline when None. Items are (output_path, callable, args) tuples.
         """
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Invalid dtype: {dtype}. Choose from {', '.join(self.DTYPES)}")
+        
+        if dtype == 'fp16' and not torch.cuda.is_available():
+            logger.warning("FP16 inference requires CUDA, falling back to fp32")
+            dtype = 'fp32'
+        
         self.lang_code = lang_code
         self.voice = voice
+        self.dtype = dtype
+        # int8 kernels are CPU-only; otherwise keep the model on the GPU when there is one
+        self.device = 'cuda' if torch.cuda.is_available() and dtype != 'int8' else 'cpu'
         self.pipeline = None
+        self.write_queue = write_queue
+        self._voice_packs = {}
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_max_bytes = cache_max_bytes
+        # Running size of the cache, known after the first scan
+        self._cache_size = None
+        self._cache_lock = threading.Lock()
+        
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            logger.info(f"Initializing Kokoro TTS with voice: {voice}")
-            self.pipeline = KPipeline(lang_code=lang_code)
-            logger.info("Kokoro TTS initialized successfully")
+            logger.info(f"Initializing Kokoro TTS with voice: {voice} on {self.device}")
+            self.pipeline = _get_pipeline(lang_code, self.device, self.dtype)
+            logger.info(f"Kokoro TTS initialized successfully with {self.dtype} precision")
         except Exception as e:
             logger.error(f"Error initializing Kokoro TTS: {e}")
             logger.error("Make sure espeak-ng is installed on your system")
             raise
     
+    def _inference_context(self):
+        """
+        Get the context manager for running the acoustic model.
+        
+        Returns:
+            Inference-mode context, with fp16 autocast when enabled
+        """
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if self.dtype == 'fp16':
+            stack.enter_context(torch.autocast('cuda', dtype=torch.float16))
+        return stack
+    
+    def _get_voice_pack(self) -> torch.Tensor:
+        """
+        Get the current voice's style pack, kept resident on the model device.
+        
+        Returns:
+            Voice pack tensor
+        """
+        if self.voice not in self._voice_packs:
+            pack = self.pipeline.load_voice(self.voice)
+            self._voice_packs[self.voice] = self._to_device(pack)
+        return self._voice_packs[self.voice]
+    
+    def _to_device(self, tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Move a CPU tensor to the model device, via pinned memory on CUDA.
+        
+        Args:
+            tensor: Tensor on the CPU
+            
+        Returns:
+            Tensor on the model device
+        """
+        if self.device == 'cuda':
+            return tensor.pin_memory().to(self.device, non_blocking=True)
+        return tensor
+    
     def generate_speech(self, text: str, output_path: str) -> bool:
         """
         Generate speech from text and save to file.
@@ -71,34 +194,360 @@ class KokoroTTSEngine:
             logger.warning("Empty text provided")
             return False
         
+        cache_file = self._cache_path(text)
+        if cache_file and self._load_cached(cache_file, output_path):
+            logger.debug("Cache hit for %s", output_path)
+            return True
+        
         try:
             # Generate audio
-            generator = self.pipeline(text, voice=self.voice, speed=1.0)
+            if self.lang_code in ('a', 'b'):
+                # Phonemize up front so only the model forwards run outside the lock
+                with _G2P_LOCK:
+                    segments = [
+                        self.pipeline.g2p(segment)[1]
+                        for segment in _RE_SEGMENT_SPLIT.split(text.strip()) if segment.strip()
+                    ]
+                generators = [
+                    self.pipeline.generate_from_tokens(tokens, voice=self.voice, speed=1.0)
+                    for tokens in segments
+                ]
+                g2p_lock = contextlib.nullcontext()
+            else:
+                # Other pipelines phonemize between model calls
+                generators = [self.pipeline(text, voice=self.voice, speed=1.0)]
+                g2p_lock = _G2P_LOCK
             
             # Collect all audio chunks
             audio_chunks = []
-            for _, _, audio in generator:
-                audio_chunks.append(audio)
+            with g2p_lock, self._inference_context():
+                for generator in generators:
+                    for _, _, audio in generator:
+                        audio_chunks.append(audio)
             
             # Concatenate all chunks
             if audio_chunks:
                 full_audio = np.concatenate(audio_chunks)
-                
-                # Save to file
-                output_path = Path(output_path)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                sf.write(str(output_path), full_audio, 24000)
-                logger.debug(f"Saved audio to {output_path}")
+                self._save_audio(full_audio, output_path, cache_file)
                 return True
             else:
                 logger.warning("No audio generated")
                 return False
                 
         except Exception as e:
-            logger.error(f"Error generating speech: {e}")
+            logger.error("Error generating speech: %s", e)
             return False
     
+    def generate_speech_batch(self, texts: List[str], output_paths: List[str],
+                              batch_size: int = 8) -> List[bool]:
+        """
+        Generate speech for several texts, running the acoustic model once per mini-batch.
+        
+        Phonemes of all texts in a mini-batch are padded into one tensor so Kokoro
+        runs a single forward pass instead of one per text. Mini-batches that fail
+        fall back to generate_speech for each text.
+        
+        Args:
+            texts: Texts to convert to speech
+            output_paths: Paths to save the audio files, one per text
+            batch_size: Number of texts per forward pass
+            
+        Returns:
+            List with True for each text that was saved successfully
+        """
+        if not self.pipeline:
+            logger.error("TTS pipeline not initialized")
+            return [False] * len(texts)
+        
+        results = [False] * len(texts)
+        pending = []
+        
+        for i, (text, output_path) in enumerate(zip(texts, output_paths)):
+            if not text or not text.strip():
+                logger.warning("Empty text provided")
+                continue
+            
+            cache_file = self._cache_path(text)
+            if cache_file and self._load_cached(cache_file, output_path):
+                logger.debug("Cache hit for %s", output_path)
+                results[i] = True
+            else:
+                pending.append(i)
+        
+        # Only English pipelines expose the g2p tokens the batched path relies on
+        if self.lang_code not in ('a', 'b'):
+            for i in pending:
+                results[i] = self.generate_speech(texts[i], output_paths[i])
+            return results
+        
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                audios = self._synthesize_batch([texts[i] for i in batch])
+                for i, audio in zip(batch, audios):
+                    if audio is None:
+                        logger.warning("No audio generated")
+                        continue
+                    self._save_audio(audio, output_paths[i], self._cache_path(texts[i]))
+                    results[i] = True
+            except Exception as e:
+                logger.warning("Batched synthesis failed, generating one by one: %s", e)
+                for i in batch:
+                    results[i] = self.generate_speech(texts[i], output_paths[i])
+        
+        return results
+    
+    def _synthesize_batch(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Synthesize several texts with one forward pass of the Kokoro model.
+        
+        Args:
+            texts: Texts to convert to speech
+            
+        Returns:
+            Audio samples per text, or None where nothing could be phonemized
+        """
+        model = self.pipeline.model
+        pack = self._get_voice_pack()
+        
+        # Phonemize; long texts are split into several segments by en_tokenize
+        with _G2P_LOCK:
+            tokens_per_text = [self.pipeline.g2p(text)[1] for text in texts]
+        
+        segments = []
+        for index, tokens in enumerate(tokens_per_text):
+            for _, phonemes, _ in self.pipeline.en_tokenize(tokens):
+                ids = [model.vocab[p] for p in phonemes if p in model.vocab]
+                if ids:
+                    segments.append((index, ids, pack[len(phonemes) - 1]))
+        
+        if not segments:
+            return [None] * len(texts)
+        
+        input_ids = self._to_device(torch.nn.utils.rnn.pad_sequence(
+            [torch.LongTensor([0, *ids, 0]) for _, ids, _ in segments], batch_first=True
+        ))
+        input_lengths = self._to_device(torch.LongTensor([len(ids) + 2 for _, ids, _ in segments]))
+        ref_s = torch.stack([ref for _, _, ref in segments]).squeeze(1)
+        
+        with self._inference_context():
+            audios = self._forward_batch(model, input_ids, input_lengths, ref_s, speed=1.0)
+        
+        if self.device == 'cuda':
+            torch.cuda.synchronize()
+        
+        # Reassemble segments into one clip per text
+        per_text = [[] for _ in texts]
+        for (index, _, _), audio in zip(segments, audios):
+            per_text[index].append(audio.float().cpu().numpy())
+        return [np.concatenate(chunks) if chunks else None for chunks in per_text]
+    
+    @staticmethod
+    def _forward_batch(model, input_ids: torch.Tensor, input_lengths: torch.Tensor,
+                       ref_s: torch.Tensor, speed: float) -> List[torch.Tensor]:
+        """
+        Batched version of KModel.forward_with_tokens for padded inputs.
+        
+        The token-level stages (BERT, duration predictor, text encoder) run on the
+        whole batch with padding masked or packed away. F0/N prediction and the
+        decoder normalize over time, so they run per row on that row's frames only,
+        keeping every row identical to an unbatched forward pass.
+        
+        Args:
+            model: Kokoro KModel
+            input_ids: Padded token ids, shape (batch, tokens)
+            input_lengths: Unpadded length of each row
+            ref_s: Voice style vectors, shape (batch, 256)
+            speed: Speaking rate
+            
+        Returns:
+            Audio tensor per row
+        """
+        batch, max_tokens = input_ids.shape
+        device = input_ids.device
+        
+        # True for padding positions
+        text_mask = torch.arange(max_tokens, device=device).unsqueeze(0) >= input_lengths.unsqueeze(1)
+        
+        bert_dur = model.bert(input_ids, attention_mask=(~text_mask).int())
+        d_en = model.bert_encoder(bert_dur).transpose(-1, -2)
+        s = ref_s[:, 128:]
+        d = model.predictor.text_encoder(d_en, s, input_lengths, text_mask)
+        
+        # Pack so the backward direction of the LSTM starts at each row's last token
+        x = torch.nn.utils.rnn.pack_padded_sequence(
+            d, input_lengths.cpu(), batch_first=True, enforce_sorted=False
+        )
+        x, _ = model.predictor.lstm(x)
+        x, _ = torch.nn.utils.rnn.pad_packed_sequence(x, batch_first=True, total_length=max_tokens)
+        duration = torch.sigmoid(model.predictor.duration_proj(x)).sum(axis=-1) / speed
+        pred_dur = torch.round(duration).clamp(min=1).long()
+        
+        t_en = model.text_encoder(input_ids, input_lengths, text_mask)
+        
+        audios = []
+        for row in range(batch):
+            length = int(input_lengths[row])
+            
+            # Alignment from this row's tokens to its frames
+            indices = torch.repeat_interleave(torch.arange(length, device=device), pred_dur[row, :length])
+            pred_aln_trg = torch.zeros((1, length, indices.shape[0]), device=device)
+            pred_aln_trg[0, indices, torch.arange(indices.shape[0], device=device)] = 1
+            
+            en = d[row:row + 1, :length].transpose(-1, -2) @ pred_aln_trg
+            F0_pred, N_pred = model.predictor.F0Ntrain(en, s[row:row + 1])
+            asr = t_en[row:row + 1, :, :length] @ pred_aln_trg
+            audios.append(model.decoder(asr, F0_pred, N_pred, ref_s[row:row + 1, :128]).squeeze())
+        
+        return audios
+    
+    def _save_audio(self, audio: np.ndarray, output_path: str, cache_file: Optional[Path]):
+        """
+        Save generated audio, handing it to the background writer when one is set.
+        
+        Args:
+            audio: Audio samples at 24 kHz
+            output_path: Path to save the audio file
+            cache_file: Cache entry to create, or None
+        """
+        if self.write_queue is not None:
+            self.write_queue.put((output_path, self._write_audio, (audio, output_path, cache_file)))
+        else:
+            self._write_audio(audio, output_path, cache_file)
+    
+    def _write_audio(self, audio: np.ndarray, output_path: str, cache_file: Optional[Path]):
+        """
+        Write generated audio to file and add it to the cache.
+        
+        Args:
+            audio: Audio samples at 24 kHz
+            output_path: Path to save the audio file
+            cache_file: Cache entry to create, or None
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # A file left over from an earlier run may be a hardlink to a cache entry;
+        # unlink it so writing creates a new inode instead of overwriting the entry
+        output_path.unlink(missing_ok=True)
+        
+        write_wav_f32_mono(str(output_path), np.asarray(audio, dtype=np.float32), 24000)
+        logger.debug("Saved audio to %s", output_path)
+        
+        if cache_file:
+            self._store_cached(output_path, cache_file)
+    
+    def _cache_path(self, text: str) -> Optional[Path]:
+        """
+        Get the cache file for a text with the current synthesis settings.
+        
+        Args:
+            text: Text to be synthesized
+            
+        Returns:
+            Path of the cache entry, or None if caching is disabled
+        """
+        if not self.cache_dir:
+            return None
+        
+        key = hashlib.blake2b(
+            f"{self.voice}|{self.lang_code}|{self.dtype}|1.0|{text}".encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+        return self.cache_dir / f"{key}.wav"
+    
+    def _load_cached(self, cache_file: Path, output_path: str) -> bool:
+        """
+        Place a cached speech file at the output path.
+        
+        Args:
+            cache_file: Cache entry to reuse
+            output_path: Path to save the audio file
+            
+        Returns:
+            True if the cache entry existed and was reused
+        """
+        if not cache_file.exists():
+            return False
+        
+        try:
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.unlink(missing_ok=True)
+            
+            # Hardlink when possible, copy across filesystems
+            try:
+                os.link(cache_file, output_path)
+            except OSError:
+                shutil.copyfile(cache_file, output_path)
+            
+            # Refresh mtime so eviction treats the entry as recently used
+            os.utime(cache_file)
+            return True
+        except OSError as e:
+            logger.warning("Error reading TTS cache entry %s: %s", cache_file, e)
+            return False
+    
+    def _store_cached(self, audio_file: Path, cache_file: Path):
+        """
+        Add a generated speech file to the cache.
+        
+        Args:
+            audio_file: Freshly generated audio file
+            cache_file: Cache entry to create
+        """
+        # Hardlink (or copy across filesystems) to a temporary name and rename,
+        # so readers never see partial entries. Sharing the inode is safe because
+        # output paths are always unlinked before they are written.
+        tmp_path = self.cache_dir / f"{uuid.uuid4().hex}.tmp"
+        try:
+            try:
+                os.link(audio_file, tmp_path)
+            except OSError:
+                shutil.copyfile(audio_file, tmp_path)
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, cache_file)
+        except OSError as e:
+            logger.warning("Error writing TTS cache entry %s: %s", cache_file, e)
+            tmp_path.unlink(missing_ok=True)
+            return
+        
+        with self._cache_lock:
+            if self._cache_size is None or self._cache_size + size > self.cache_max_bytes:
+                self._evict_cache()
+            else:
+                self._cache_size += size
+    
+    def _evict_cache(self):
+        """
+        Remove least recently used cache entries once over the size limit.
+        
+        Rescans the cache directory and resets the running cache size; called with
+        the cache lock held.
+        """
+        try:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.name.endswith('.wav'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            logger.warning("Error scanning TTS cache: %s", e)
+            return
+        
+        total_size = sum(size for _, size, _ in entries)
+        if total_size > self.cache_max_bytes:
+            target_size = self.cache_max_bytes * self.CACHE_EVICT_TARGET
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                    total_size -= size
+                except OSError:
+                    continue
+                if total_size <= target_size:
+                    break
+        
+        self._cache_size = total_size
+    
     def set_voice(self, voice: str) -> bool:
         """
         Change the voice.
@@ -133,5 +582,4 @@ class KokoroTTSEngine:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        # Cleanup if needed
-        self.pipeline = None
\ No newline at end of file
+        # The shared pipeline stays loaded for the next engine
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""Low-level WAV helpers that work on the raw file bytes."""
+
+import os
+import shutil
+import struct
+from pathlib import Path
+from typing import BinaryIO, List, NamedTuple, Optional
+import numpy as np
+
+# WAVE_FORMAT_IEEE_FLOAT format tag
+_FORMAT_FLOAT = 3
+
+# Buffer size for the user-space copy fallback (1 MiB)
+_COPY_BUFFER_SIZE = 1 << 20
+
+# Largest value of a 32-bit RIFF size field; larger files are written as RF64
+_MAX_CHUNK_SIZE = 0xFFFFFFFF
+
+
+class WavLayout(NamedTuple):
+    """Location of the parts of a WAV file needed to splice PCM data."""
+    fmt: bytes
+    data_offset: int
+    data_size: int
+    size_field_offset: int
+    fact_field_offset: Optional[int]
+
+
+def read_wav_layout(path: str) -> WavLayout:
+    """
+    Locate the format description and sample data of a WAV file.
+    
+    Args:
+        path: Path to the WAV file
+        
+    Returns:
+        WavLayout of the file
+        
+    Raises:
+        ValueError: If the file is not a RIFF/WAVE file with a data chunk
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise ValueError(f"Not a WAV file: {path}")
+            
+        fmt = None
+        fact_field_offset = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in WAV file: {path}")
+                
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"No fmt chunk before data in WAV file: {path}")
+                return WavLayout(fmt, f.tell(), chunk_size, f.tell() - 4, fact_field_offset)
+                
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                f.seek(chunk_size & 1, 1)
+            else:
+                if chunk_id == b'fact':
+                    # Sample frame count, present in non-PCM (e.g. float) files
+                    fact_field_offset = f.tell()
+                # Chunks are word aligned
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def concatenate_wav(audio_files: List[str], output_file: str, silence_frames: int = 0) -> bool:
+    """
+    Concatenate WAV files of identical format by splicing their sample data.
+    
+    The first file is copied as is, the data sections of the others are appended
+    to it in the kernel where possible and the RIFF/data size fields are patched,
+    so no samples are decoded or pass through Python buffers. Output too large
+    for 32-bit RIFF size fields (4 GiB) is written as RF64 instead.
+    
+    Args:
+        audio_files: List of WAV file paths
+        output_file: Output file path
+        silence_frames: Frames of silence inserted between consecutive files
+        
+    Returns:
+        True if the files were concatenated, False if their layout does not allow
+        splicing (unreadable files, different formats, or trailing chunks after the data)
+    """
+    try:
+        layouts = [read_wav_layout(path) for path in audio_files]
+    except (OSError, ValueError, struct.error):
+        return False
+    first = layouts[0]
+    
+    if any(layout.fmt != first.fmt for layout in layouts):
+        return False
+    if first.data_offset + first.data_size != Path(audio_files[0]).stat().st_size:
+        return False
+        
+    block_align = struct.unpack('<H', first.fmt[12:14])[0]
+    silence = bytes(silence_frames * block_align)  # zero bytes are silence for PCM and float
+    data_size = sum(layout.data_size for layout in layouts) + len(silence) * (len(layouts) - 1)
+    
+    # Check the size before copying anything so an oversized result is never left half written
+    if first.data_offset + data_size - 8 > _MAX_CHUNK_SIZE:
+        _write_rf64(audio_files, layouts, output_file, silence, data_size)
+        return True
+        
+    shutil.copyfile(audio_files[0], output_file)
+    
+    with open(output_file, 'r+b') as out:
+        out.seek(0, 2)
+        for path, layout in zip(audio_files[1:], layouts[1:]):
+            out.write(silence)
+            out.flush()
+            with open(path, 'rb') as src:
+                _append_range(src, out, layout.data_offset, layout.data_size)
+                
+        # Patch the data chunk and RIFF sizes
+        file_size = out.tell()
+        out.seek(first.size_field_offset)
+        out.write(struct.pack('<I', data_size))
+        out.seek(4)
+        out.write(struct.pack('<I', file_size - 8))
+        
+        if first.fact_field_offset is not None:
+            out.seek(first.fact_field_offset)
+            out.write(struct.pack('<I', data_size // block_align))
+            
+    return True
+
+
+def _write_rf64(audio_files: List[str], layouts: List[WavLayout], output_file: str,
+                silence: bytes, data_size: int):
+    """
+    Write the spliced sample data of WAV files as an RF64 file (EBU Tech 3306).
+    
+    Args:
+        audio_files: List of WAV file paths
+        layouts: WavLayout of each file
+        output_file: Output file path
+        silence: Silence inserted between consecutive files
+        data_size: Total size of the sample data in bytes
+    """
+    fmt = layouts[0].fmt
+    block_align = struct.unpack('<H', fmt[12:14])[0]
+    
+    # The 32-bit size fields are set to -1 and the real sizes live in the ds64 chunk
+    chunks = b'fmt ' + struct.pack('<I', len(fmt)) + fmt + bytes(len(fmt) & 1)
+    if layouts[0].fact_field_offset is not None:
+        chunks += b'fact' + struct.pack('<II', 4, _MAX_CHUNK_SIZE)
+    header_size = 12 + 36 + len(chunks) + 8
+    header = (
+        struct.pack('<4sI4s', b'RF64', _MAX_CHUNK_SIZE, b'WAVE')
+        + struct.pack('<4sIQQQI', b'ds64', 28, header_size + data_size - 8, data_size,
+                      data_size // block_align, 0)
+        + chunks
+        + struct.pack('<4sI', b'data', _MAX_CHUNK_SIZE)
+    )
+    
+    with open(output_file, 'wb') as out:
+        out.write(header)
+        for i, (path, layout) in enumerate(zip(audio_files, layouts)):
+            if i:
+                out.write(silence)
+            out.flush()
+            with open(path, 'rb') as src:
+                _append_range(src, out, layout.data_offset, layout.data_size)
+
+
+def _append_range(src: BinaryIO, dst: BinaryIO, offset: int, count: int):
+    """
+    Append a byte range of one file to the end of another.
+    
+    Uses copy_file_range(2) so the copy stays in the kernel (or becomes a reflink),
+    then sendfile(2), then a plain buffered copy where neither is available.
+    
+    Args:
+        src: Source file opened for reading
+        dst: Destination file, flushed and positioned at its end
+        offset: Start of the range in the source file
+        count: Number of bytes to copy
+    """
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    
+    for copy in (_copy_file_range, _sendfile):
+        try:
+            while count > 0:
+                copied = copy(src_fd, dst_fd, offset, count)
+                if copied == 0:
+                    break
+                offset += copied
+                count -= copied
+        except (AttributeError, OSError):
+            # Not supported on this platform or between these filesystems
+            continue
+        if count == 0:
+            break
+            
+    # Resynchronize the buffered position with the descriptor moved by the kernel
+    dst.seek(0, 2)
+    
+    if count > 0:
+        src.seek(offset)
+        while count > 0:
+            block = src.read(min(count, _COPY_BUFFER_SIZE))
+            if not block:
+                raise ValueError("Unexpected end of WAV data")
+            dst.write(block)
+            count -= len(block)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    """Copy with copy_file_range(2), appending at the destination's position."""
+    return os.copy_file_range(src_fd, dst_fd, count, offset_src=offset)
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    """Copy with sendfile(2), appending at the destination's position."""
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def write_wav_f32_mono(path: str, samples: np.ndarray, samplerate: int = 24000):
+    """
+    Write mono samples as a 32-bit float WAV file with a minimal 44-byte header.
+    
+    Args:
+        path: Output file path
+        samples: Mono audio samples
+        samplerate: Sample rate in Hz
+    """
+    samples = np.ascontiguousarray(samples, dtype='<f4')
+    header = struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + samples.nbytes, b'WAVE',
+        b'fmt ', 16, _FORMAT_FLOAT, 1, samplerate, samplerate * 4, 4, 32,
+        b'data', samples.nbytes
+    )
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(memoryview(samples))
\ No newline at end of file